@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 
 import mygrad
@@ -161,22 +163,31 @@ def mean(x, axis=None, keepdims=False, constant=False):
     return Tensor._op(Mean, x, op_args=(axis, keepdims), constant=constant)
 
 
-# Fixes weights shape when it's not equal to x
-def _canonicalize_weights(x, axis, weights):
+@lru_cache(maxsize=512)
+def _canonical_shape(x_shape, axis, w_shape):
+    """Returns the shape that weights of shape `w_shape` must be reshaped to
+    in order to broadcast against `x` along `axis`."""
     # https://github.com/numpy/numpy/blob/c31cc36a8a814ed4844a2a553454185601914a5a/numpy/lib/function_base.py#L397
-    if x.shape == weights.shape:
-        return weights
+    if x_shape == w_shape:
+        return w_shape
     if axis is None:
-        raise TypeError(
-            "Axis must be specified when shapes of a and weights differ."
-        )
-    if weights.ndim != 1:
+        raise TypeError("Axis must be specified when shapes of a and weights differ.")
+    if len(w_shape) != 1:
         raise TypeError("1D weights expected when shapes of a and weights differ.")
-    if weights.shape[0] != x.shape[axis]:
+    if w_shape[0] != x_shape[axis]:
         raise ValueError("Length of weights not compatible with specified axis.")
     # setup weights to broadcast along axis
-    weights = mygrad.broadcast_to(weights, (x.ndim - 1) * (1,) + weights.shape)
-    return weights.swapaxes(-1, axis)
+    shape = [1] * len(x_shape)
+    shape[axis] = w_shape[0]
+    return tuple(shape)
+
+
+# Fixes weights shape when it's not equal to x
+def _canonicalize_weights(x, axis, weights):
+    shape = _canonical_shape(x.shape, axis, weights.shape)
+    if shape == weights.shape:
+        return weights
+    return mygrad.reshape(weights, shape)
 
 
 def average(x, axis=None, weights=None, constant=False, returned=False):
@@ -1,15 +1,16 @@
-from functools import partial
+from functools import lru_cache, partial, reduce
+from operator import mul
 
 import hypothesis.extra.numpy as hnp
 import hypothesis.strategies as st
 import numpy as np
 import pytest
-from hypothesis import given, settings
+from hypothesis import HealthCheck, given, settings
 from pytest import raises
 
 import mygrad as mg
 from mygrad import amax, amin, average, cumprod, cumsum, mean, prod, std, sum, var
-from mygrad.math.sequential.funcs import _canonicalize_weights
+from mygrad.math.sequential.funcs import _canonical_shape, _canonicalize_weights
 
 from ...custom_strategies import valid_axes
 from ...wrappers.uber import (
@@ -17,11 +18,22 @@ from ...wrappers.uber import (
     fwdprop_test_factory as fwdprop_test_factory,
 )
 
+_FINITE_FLOAT_ARRAYS = hnp.arrays(
+    dtype=np.float64,
+    shape=hnp.array_shapes(),
+    elements=st.floats(allow_infinity=False, allow_nan=False),
+)
+
+
+# Axis strategies depend only on the array's dimensionality; these are
+# cached so that a strategy isn't rebuilt for each drawn example
+_valid_axes = lru_cache(maxsize=None)(valid_axes)
+
 
 def axis_arg(*arrs, min_dim=0):
     """ Wrapper for passing valid-axis search strategy to test factory"""
     if arrs[0].ndim:
-        return valid_axes(arrs[0].ndim, min_dim=min_dim)
+        return _valid_axes(arrs[0].ndim, min_dim=min_dim)
     else:
         return st.just(tuple())
 
@@ -30,7 +42,7 @@ def single_axis_arg(*arrs):
     """ Wrapper for passing valid-axis (single-value only)
     search strategy to test factory"""
     if arrs[0].ndim:
-        return valid_axes(arrs[0].ndim, single_axis_only=True)
+        return _valid_axes(arrs[0].ndim, single_axis_only=True)
     else:
         return st.none()
 
@@ -40,37 +52,74 @@ def keepdims_arg(*arrs):
     return st.booleans()
 
 
+@lru_cache(maxsize=256)
+def _min_side(shape):
+    return min(shape) if shape else 0
+
+
 def ddof_arg(*arrs):
     """ Wrapper for passing ddof strategy to test factory
     (argument for var and std)"""
-    min_side = min(arrs[0].shape) if arrs[0].shape else 0
+    min_side = _min_side(arrs[0].shape)
     return st.integers(0, min_side - 1) if min_side else st.just(0)
 
 
+_WT_SAME_SHAPE, _WT_1D = range(2)
+_WT_MODES = st.sampled_from((_WT_SAME_SHAPE, _WT_1D))
+
+# The average tests exclude 0D arrays, for which the weights and axis are trivial
+_AVERAGE_ARR_SHAPES = {0: hnp.array_shapes(min_dims=1, max_dims=3, max_side=3)}
+
+
+def _normalize_axes(axis, ndim):
+    if axis is None:
+        return tuple(range(ndim))
+    if isinstance(axis, int):
+        axis = (axis,)
+    return tuple(i % ndim for i in axis)
+
+
+def _set_group_sums(weights, sums, axes):
+    """Adjusts the first weight of each reduction-group (i.e. along `axes`)
+    so that each group sums to the corresponding value in `sums`"""
+    weights = weights.copy()
+    first = tuple(
+        slice(0, 1) if i in axes else slice(None) for i in range(weights.ndim)
+    )
+    weights[first] += sums - weights.sum(axis=axes, keepdims=True)
+    return weights
+
+
 @st.composite
 def gen_average_args(draw, arr):
+    # `arr` must have at least one dimension; see `_AVERAGE_ARR_SHAPES`
+    #
     # Weight is either
     # - the same shape as arr OR
     # - 1D with compatible length
     # See: https://github.com/numpy/numpy/blob/c31cc36a8a814ed4844a2a553454185601914a5a/numpy/lib/function_base.py#L397
-    wt_same_shape, wt_1D = range(2)
-    if (
-        arr.ndim == 0
-        or draw(st.one_of(st.just(wt_same_shape), st.just(wt_1D))) == wt_same_shape
-    ):
+    if draw(_WT_MODES) == _WT_SAME_SHAPE:
         axis = draw(axis_arg(arr))
         wt_shape = arr.shape
-    else:  # wt_1D
+    else:  # _WT_1D
         # Only integer axis is supported for 1D weights
         axis = draw(st.integers(min_value=-arr.ndim, max_value=arr.ndim - 1))
         wt_shape = (arr.shape[axis],)
-    # Filter any axis summing up to 0 to avoid ZeroDivisionError
-    wt_strat = hnp.arrays(
-        dtype=np.float, shape=wt_shape, elements=st.floats(min_value=-10, max_value=10),
-    ).filter(
-        lambda wt: not np.isclose(
-            _canonicalize_weights(arr, axis, wt).sum(axis=axis).data, 0
-        ).any()
+    # Weights must not sum to 0 along `axis`, which raises ZeroDivisionError.
+    # Rather than filtering, this holds by construction: the weights are drawn
+    # freely from [-10, 10], and then the first weight of each reduction-group
+    # is set such that the group sums to a value whose magnitude is in [1, 10]
+    canon_shape = _canonical_shape(arr.shape, axis, wt_shape)
+    axes = _normalize_axes(axis, len(canon_shape))
+    sums_shape = tuple(1 if i in axes else n for i, n in enumerate(canon_shape))
+    wt_strat = st.tuples(
+        hnp.arrays(dtype=np.float64, shape=wt_shape, elements=st.floats(-10, 10)),
+        hnp.arrays(dtype=np.float64, shape=sums_shape, elements=st.floats(1, 10)),
+        hnp.arrays(dtype=bool, shape=sums_shape),
+    ).map(
+        lambda x: _set_group_sums(
+            x[0].reshape(canon_shape), np.where(x[2], -x[1], x[1]), axes
+        ).reshape(wt_shape)
     )
     weights = draw(st.none() | wt_strat)
     return dict(axis=axis, weights=weights)
@@ -172,7 +221,11 @@ def test_mean_bkwd():
 
 
 @fwdprop_test_factory(
-    mygrad_func=average, true_func=np.average, num_arrays=1, kwargs=gen_average_args,
+    mygrad_func=average,
+    true_func=np.average,
+    num_arrays=1,
+    kwargs=gen_average_args,
+    index_to_arr_shapes=_AVERAGE_ARR_SHAPES,
 )
 def test_average_fwd():
     pass
@@ -202,6 +255,7 @@ def test_canonicalize_weights():
     # Differing shapes, make weights broadcastable
     assert _canonicalize_weights(x, axis=0, weights=np.empty((2,))).shape == (2, 1)
     assert _canonicalize_weights(x, axis=1, weights=np.empty((2,))).shape == (1, 2)
+    assert _canonical_shape((2, 3, 4), -2, (3,)) == (1, 3, 1)
 
 
 def test_canonicalize_weights_misuse():
@@ -222,6 +276,7 @@ def test_canonicalize_weights_misuse():
     true_func=np.average,
     num_arrays=1,
     kwargs=gen_average_args,
+    index_to_arr_shapes=_AVERAGE_ARR_SHAPES,
     index_to_bnds={0: (-10, 10)},
     vary_each_element=True,
 )
@@ -229,9 +284,13 @@ def test_average_bkwd():
     pass
 
 
+def _returned_scl(average_func, x, axis, weights):
+    return average_func(x, axis=axis, weights=weights, returned=True)[1]
+
+
 # Helps test the 2nd Tensor output of average.
 def average_returned_wrapper(average_func):
-    return lambda x, axis, weights: average_func(x, axis=axis, weights=weights, returned=True)[1]
+    return partial(_returned_scl, average_func)
 
 
 @backprop_test_factory(
@@ -239,6 +298,7 @@ def average_returned_wrapper(average_func):
     true_func=average_returned_wrapper(np.average),
     num_arrays=1,
     kwargs=gen_average_args,
+    index_to_arr_shapes=_AVERAGE_ARR_SHAPES,
     index_to_bnds={0: (-10, 10)},
     vary_each_element=True,
 )
@@ -258,23 +318,35 @@ def test_var_fwd():
     pass
 
 
+def _prod(seq):
+    """Product of a sequence of ints; avoids `np.prod`'s array creation"""
+    return reduce(mul, seq, 1)
+
+
 def _var(x, keepdims=False, axis=None, ddof=0):
     """Defines variance without using abs. Permits use of
     complex-step numerical derivative."""
-    x = np.asarray(x)
-
-    def mean(y, keepdims=False, axis=None, ddof=0):
-        if isinstance(axis, int):
-            axis = (axis,)
-        N = y.size if axis is None else np.prod([y.shape[i] for i in axis])
-        return y.sum(keepdims=keepdims, axis=axis) / (N - ddof)
-
-    return mean(
-        (x - x.mean(axis=axis, keepdims=True)) ** 2,
-        keepdims=keepdims,
-        axis=axis,
-        ddof=ddof,
-    )
+    # strided inputs are copied once, so that the reductions below
+    # run over contiguous memory
+    x = np.asarray(x, order="C")
+    if isinstance(axis, int):
+        axis = (axis,)
+
+    N = x.size if axis is None else _prod(x.shape[i] for i in axis)
+
+    dev = x - x.mean(axis=axis, keepdims=True)
+    if axis is None:
+        # the sum of squares of the flattened deviations is a single dot-product;
+        # note that `np.dot` does not conjugate complex values, unlike `np.vdot`
+        dev = dev.ravel()
+        sum_sq = np.dot(dev, dev)
+        if keepdims:
+            sum_sq = np.reshape(sum_sq, (1,) * x.ndim)
+    else:
+        # square the deviations in-place, rather than allocating a second temporary
+        dev *= dev
+        sum_sq = dev.sum(keepdims=keepdims, axis=axis)
+    return sum_sq / (N - ddof)
 
 
 @fwdprop_test_factory(
@@ -289,6 +361,19 @@ def test_custom_var_fwd():
     pass
 
 
+@pytest.mark.parametrize("keepdims", [False, True])
+@pytest.mark.parametrize(
+    ("shape", "ddof"), [((), 0), ((3,), 0), ((3,), 1), ((2, 3, 4), 0), ((2, 3, 4), 1)]
+)
+def test_var_reference_no_axis(shape, ddof, keepdims):
+    """`_var` has a dedicated code-path for `axis=None`"""
+    x = np.arange(np.prod(shape), dtype=float).reshape(shape) ** 2
+    actual = _var(x, axis=None, ddof=ddof, keepdims=keepdims)
+    expected = np.var(x, axis=None, ddof=ddof, keepdims=keepdims)
+    assert np.shape(actual) == np.shape(expected)
+    assert np.allclose(actual, expected)
+
+
 @backprop_test_factory(
     mygrad_func=var,
     true_func=_var,
@@ -303,30 +388,18 @@ def test_var_bkwd():
     pass
 
 
-@given(
-    x=hnp.arrays(
-        dtype=np.float,
-        shape=hnp.array_shapes(),
-        elements=st.floats(allow_infinity=False, allow_nan=False),
-    )
-)
+@given(x=_FINITE_FLOAT_ARRAYS)
 def test_var_no_axis_fwd(x):
     x = mg.Tensor(x, constant=False)
     o = mg.var(x, axis=())
-    assert np.all(o.data == np.zeros_like(x.data))
+    assert not o.data.any()
 
 
-@given(
-    x=hnp.arrays(
-        dtype=np.float,
-        shape=hnp.array_shapes(),
-        elements=st.floats(allow_infinity=False, allow_nan=False),
-    )
-)
+@given(x=_FINITE_FLOAT_ARRAYS)
 def test_var_no_axis_bkwrd(x):
     x = mg.Tensor(x, constant=False)
     mg.var(x, axis=()).backward()
-    assert np.all(x.grad == np.zeros_like(x.data))
+    assert not x.grad.any()
 
 
 @fwdprop_test_factory(
@@ -344,22 +417,7 @@ def test_std_fwd():
 def _std(x, keepdims=False, axis=None, ddof=0):
     """Defines standard dev without using abs. Permits use of
     complex-step numerical derivative."""
-    x = np.asarray(x)
-
-    def mean(y, keepdims=False, axis=None, ddof=0):
-        if isinstance(axis, int):
-            axis = (axis,)
-        N = y.size if axis is None else np.prod([y.shape[i] for i in axis])
-        return y.sum(keepdims=keepdims, axis=axis) / (N - ddof)
-
-    return np.sqrt(
-        mean(
-            (x - x.mean(axis=axis, keepdims=True)) ** 2,
-            keepdims=keepdims,
-            axis=axis,
-            ddof=ddof,
-        )
-    )
+    return np.sqrt(_var(x, keepdims=keepdims, axis=axis, ddof=ddof))
 
 
 @fwdprop_test_factory(
@@ -395,30 +453,18 @@ def test_std_bkwd():
     pass
 
 
-@given(
-    x=hnp.arrays(
-        dtype=np.float,
-        shape=hnp.array_shapes(),
-        elements=st.floats(allow_infinity=False, allow_nan=False),
-    )
-)
+@given(x=_FINITE_FLOAT_ARRAYS)
 def test_std_no_axis_fwd(x):
     x = mg.Tensor(x, constant=False)
     o = mg.std(x, axis=())
-    assert np.all(o.data == np.zeros_like(x.data))
+    assert not o.data.any()
 
 
-@given(
-    x=hnp.arrays(
-        dtype=np.float,
-        shape=hnp.array_shapes(),
-        elements=st.floats(allow_infinity=False, allow_nan=False),
-    )
-)
+@given(x=_FINITE_FLOAT_ARRAYS)
 def test_std_no_axis_bkwrd(x):
     x = mg.Tensor(x, constant=False)
     mg.std(x, axis=()).backward()
-    assert np.all(x.grad == np.zeros_like(x.data))
+    assert not x.grad.any()
 
 
 @fwdprop_test_factory(
@@ -481,7 +527,7 @@ def test_cumprod_fwd():
     pass
 
 
-@settings(deadline=None)
+@settings(deadline=None, max_examples=50)
 @backprop_test_factory(
     mygrad_func=cumprod,
     true_func=np.cumprod,
@@ -494,7 +540,7 @@ def test_cumprod_bkwd():
     pass
 
 
-@settings(deadline=None)
+@settings(deadline=None, max_examples=25, suppress_health_check=[HealthCheck.too_slow])
 @backprop_test_factory(
     mygrad_func=cumprod,
     true_func=np.cumprod,
@@ -534,7 +580,7 @@ def test_cumsum_fwd():
     pass
 
 
-@settings(deadline=None)
+@settings(deadline=None, max_examples=50)
 @backprop_test_factory(
     mygrad_func=cumsum,
     true_func=np.cumsum,
@@ -1,5 +1,5 @@
 from copy import copy
-from functools import wraps
+from functools import lru_cache, wraps
 from itertools import combinations
 from numbers import Real
 from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
@@ -27,6 +27,13 @@ def _to_dict(x):
     return x
 
 
+@lru_cache(maxsize=None)
+def _broadcastable_shapes(num_shapes: int) -> st.SearchStrategy:
+    """ The default shapes-strategy for a test factory. This is shared across
+    all factories that draw the same number of shapes."""
+    return hnp.mutually_broadcastable_shapes(num_shapes=num_shapes)
+
+
 class fwdprop_test_factory:
     """ Decorator
 
@@ -178,7 +185,7 @@ class fwdprop_test_factory:
 
         if shapes is None:
             self.shapes = (
-                hnp.mutually_broadcastable_shapes(num_shapes=len(self.missing_shapes))
+                _broadcastable_shapes(len(self.missing_shapes))
                 if self.missing_shapes
                 else st.just(hnp.BroadcastableShapes(input_shapes=(), result_shape=()))
             )
@@ -531,7 +538,7 @@ class backprop_test_factory:
 
         if shapes is None:
             self.shapes = (
-                hnp.mutually_broadcastable_shapes(num_shapes=len(self.missing_shapes))
+                _broadcastable_shapes(len(self.missing_shapes))
                 if self.missing_shapes
                 else st.just(hnp.BroadcastableShapes(input_shapes=(), result_shape=()))
             )